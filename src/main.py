@@ -1,18 +1,30 @@
 """Entry point for the Reddit Riftbound bot."""
 import logging
 import os
+import queue
 import threading
 import time
-from typing import Iterable
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Iterable
 
 from reddit_api import (
     build_reddit_client,
+    extract_card_mentions,
     extract_card_tags,
+    is_rate_limit_error,
+    rate_limit_wait_seconds,
+    set_known_card_names,
     stream_comments,
     stream_submissions,
 )
 
-from riftbound_api import compose_card_reply, fallback_search_card_image, search_card_details
+from riftbound_api import (
+    compose_card_reply,
+    fallback_search_card_image,
+    fetch_card_names,
+    search_card_details,
+)
 
 
 logger = logging.getLogger(__name__)
@@ -26,6 +38,65 @@ HARD_CODED_USER_AGENT = "riftbound_cardfetcher_bot/0.1 by Gauwal"
 HARD_CODED_USERNAME = ""
 HARD_CODED_PASSWORD = ""
 
+# Resolves the distinct card tags of a comment tree concurrently.
+_RESOLVE_EXECUTOR = ThreadPoolExecutor(max_workers=8, thread_name_prefix="card-resolve")
+
+# Replies are posted by a single worker so streams never block on reply I/O.
+REPLY_QUEUE_MAXSIZE = 256
+# Without a wait in Reddit's RATELIMIT message, back off 5 s doubling up to
+# 600 s; 9 attempts let the backoff reach that cap.
+REPLY_MAX_ATTEMPTS = 9
+REPLY_INITIAL_BACKOFF_SECONDS = 5.0
+REPLY_MAX_BACKOFF_SECONDS = 600.0
+reply_queue: "queue.Queue[tuple[Any, str]]" = queue.Queue(maxsize=REPLY_QUEUE_MAXSIZE)
+
+# Upper bound on remembered fullnames; the oldest are forgotten first.
+# Override with the PROCESSED_FULLNAMES_MAXSIZE environment variable.
+PROCESSED_FULLNAMES_MAXSIZE = 50_000
+
+
+class ProcessedTracker:
+    """Thread-safe, bounded record of already processed fullnames.
+
+    A set answers membership and a deque remembers insertion order for
+    eviction, which is lighter per entry than an OrderedDict.
+    """
+
+    def __init__(self, maxsize: int = PROCESSED_FULLNAMES_MAXSIZE) -> None:
+        if maxsize < 1:
+            raise ValueError(f"ProcessedTracker maxsize must be at least 1, got {maxsize}")
+        self.maxsize = maxsize
+        self._seen: set[str] = set()
+        self._order: deque[str] = deque()
+        self._lock = threading.Lock()
+
+    def seen_and_mark(self, fullname: str) -> bool:
+        """Return True if fullname was already seen, else record it and return False."""
+        with self._lock:
+            if fullname in self._seen:
+                return True
+            if len(self._order) >= self.maxsize:
+                self._seen.discard(self._order.popleft())
+            self._seen.add(fullname)
+            self._order.append(fullname)
+            return False
+
+
+def _unique_in_order(values: Iterable[str]) -> list[str]:
+    """Strip values and drop blanks and case-insensitive duplicates, keeping order."""
+    seen: set[str] = set()
+    out: list[str] = []
+    for v in values:
+        stripped = v.strip()
+        if not stripped:
+            continue
+        key = stripped.lower()
+        if key in seen:
+            continue
+        seen.add(key)
+        out.append(stripped)
+    return out
+
 
 def load_config(config_path: str | None = None) -> dict:
     """Load credentials, preferring env vars, else inline constants above."""
@@ -36,6 +107,8 @@ def load_config(config_path: str | None = None) -> dict:
     password = os.environ.get("REDDIT_PASSWORD", "") or HARD_CODED_PASSWORD
     backfill_limit = int(os.environ.get("BACKFILL_LIMIT", "25"))
     reply_enabled = os.environ.get("BOT_REPLY", "0") == "1"
+    detect_mentions = os.environ.get("BOT_DETECT_MENTIONS", "0") == "1"
+    processed_maxsize = int(os.environ.get("PROCESSED_FULLNAMES_MAXSIZE", str(PROCESSED_FULLNAMES_MAXSIZE)))
     return {
         "client_id": client_id,
         "client_secret": client_secret,
@@ -44,17 +117,21 @@ def load_config(config_path: str | None = None) -> dict:
         "password": password,
         "backfill_limit": backfill_limit,
         "reply_enabled": reply_enabled,
+        "detect_mentions": detect_mentions,
+        "processed_maxsize": processed_maxsize,
     }
 
 
 def run_bot(subreddits: Iterable[str]) -> None:
     """Backfill + stream submissions and comments.
 
-    Prints everything it sees; when it finds [[Card Name]] tags it resolves them
-    via Riftcodex and prints the image URL.
+    Logs everything it sees at DEBUG level (BOT_DEBUG=1); when it finds
+    [[Card Name]] tags it resolves them via Riftcodex and logs the image URL.
 
     If BOT_REPLY=1 and REDDIT_USERNAME/REDDIT_PASSWORD are set, it will reply.
     """
+    # Materialize once: backfill and both watchers each iterate the names.
+    subreddits = tuple(subreddits)
     cfg = load_config(None)
     if not cfg["client_id"] or not cfg["client_secret"]:
         raise RuntimeError("Set REDDIT_CLIENT_ID and REDDIT_CLIENT_SECRET in the environment.")
@@ -67,35 +144,18 @@ def run_bot(subreddits: Iterable[str]) -> None:
         except Exception:
             me = None
 
-    processed_fullnames: set[str] = set()
-    card_cache: dict[str, str] = {}
-
-    def _unique_in_order(values: list[str]) -> list[str]:
-        seen: set[str] = set()
-        out: list[str] = []
-        for v in values:
-            key = v.strip().lower()
-            if not key or key in seen:
-                continue
-            seen.add(key)
-            out.append(v.strip())
-        return out
-
-    def resolve_card_cached(card_name: str) -> str:
-        key = card_name.strip().lower()
-        if key in card_cache:
-            return card_cache[key]
-
-        details = search_card_details(card_name)
-        image_url = details.get("image_url") if details else None
-        if not image_url:
-            image_url = fallback_search_card_image(card_name)
-
-        msg = compose_card_reply(card_name, image_url, details if details else None)
-        card_cache[key] = msg
-        return msg
-
-    def maybe_reply(thing, card_names: list[str]) -> None:
+    if cfg["detect_mentions"]:
+        try:
+            set_known_card_names(fetch_card_names())
+        except Exception as exc:  # noqa: BLE001
+            logger.exception("Failed to load card names for mention detection: %s", exc)
+
+    processed = ProcessedTracker(cfg["processed_maxsize"])
+
+    if cfg["reply_enabled"]:
+        threading.Thread(target=_reply_worker, name="reply-worker", daemon=True).start()
+
+    def maybe_reply(thing, lines: list[str]) -> None:
         if not cfg["reply_enabled"]:
             return
         if not cfg["username"] or not cfg["password"]:
@@ -108,55 +168,53 @@ def run_bot(subreddits: Iterable[str]) -> None:
             except Exception:
                 pass
 
-        lines = [resolve_card_cached(cn) for cn in _unique_in_order(card_names)]
-        if not lines:
-            return
         reply_text = "\n\n---\n\n".join(lines)
         try:
-            thing.reply(reply_text)
-        except Exception as exc:  # noqa: BLE001
-            logger.exception("Reply failed: %s", exc)
+            reply_queue.put_nowait((thing, reply_text))
+        except queue.Full:
+            logger.warning("Reply queue full; dropping reply to %s", getattr(thing, "id", thing))
+
+    def report_cards(thing, tags: list[str]) -> None:
+        # Resolve each tag once; the same lines are logged and replied with.
+        lines = [resolve_card(tag) for tag in tags]
+        for tag, line in zip(tags, lines):
+            logger.info("[card] %s -> %s", tag, line)
+        maybe_reply(thing, lines)
 
     def process_comment(comment) -> None:
         fullname = getattr(comment, "fullname", None) or f"t1_{comment.id}"
-        if fullname in processed_fullnames:
+        if processed.seen_and_mark(fullname):
             return
-        processed_fullnames.add(fullname)
 
         tags = _unique_in_order(extract_card_tags(comment.body or ""))
-        preview = (comment.body or "").replace("\n", " ")
-        print(f"[comment] {comment.id} :: {preview[:140]} :: tags={tags}")
+        if logger.isEnabledFor(logging.DEBUG):
+            preview = (comment.body or "").replace("\n", " ")[:140]
+            logger.debug("[comment] %s :: %s :: tags=%s", comment.id, preview, tags)
+        log_mentions(comment.id, comment.body or "")
         if tags:
-            for tag in tags:
-                print(resolve_card_cached(tag))
-            maybe_reply(comment, tags)
+            report_cards(comment, tags)
 
     def process_submission_and_comments(submission) -> None:
         fullname = getattr(submission, "fullname", None) or f"t3_{submission.id}"
-        if fullname not in processed_fullnames:
-            processed_fullnames.add(fullname)
-
+        if not processed.seen_and_mark(fullname):
             body = (submission.title or "") + "\n" + (getattr(submission, "selftext", "") or "")
             tags = _unique_in_order(extract_card_tags(body))
-            print(f"[submission] {submission.id} :: {submission.title} :: tags={tags}")
+            logger.debug("[submission] %s :: %s :: tags=%s", submission.id, submission.title, tags)
+            log_mentions(submission.id, body)
             if tags:
-                for tag in tags:
-                    print(resolve_card_cached(tag))
-                maybe_reply(submission, tags)
+                report_cards(submission, tags)
 
         try:
             submission.comments.replace_more(limit=0)
-            for comment in submission.comments.list():
+            comments = submission.comments.list()
+            prefetch_cards(tag for comment in comments for tag in extract_card_tags(comment.body or ""))
+            for comment in comments:
                 process_comment(comment)
         except Exception as exc:  # noqa: BLE001
             logger.exception("Failed to load comments for %s: %s", submission.id, exc)
 
     # Backfill: fetch recent posts and all their comments.
-    for sub in subreddits:
-        print(f"[backfill] r/{sub} latest {cfg['backfill_limit']}")
-        for submission in reddit.subreddit(sub).new(limit=cfg["backfill_limit"]):
-            process_submission_and_comments(submission)
-            time.sleep(0.2)
+    backfill(reddit, subreddits, cfg["backfill_limit"], process_submission_and_comments)
 
     def watch_submissions() -> None:
         for submission in stream_submissions(subreddits):
@@ -166,6 +224,8 @@ def run_bot(subreddits: Iterable[str]) -> None:
         for comment in stream_comments(subreddits):
             process_comment(comment)
 
+    # Both watchers use the one PRAW client built above, so they already share
+    # its HTTP session, OAuth token and rate limiter.
     threads = [
         threading.Thread(target=watch_submissions, name="submission-stream", daemon=True),
         threading.Thread(target=watch_comments, name="comment-stream", daemon=True),
@@ -179,19 +239,28 @@ def run_bot(subreddits: Iterable[str]) -> None:
 
 
 def handle_submission(submission) -> None:
-    """Process a new submission: print title, URL, and any card tags."""
+    """Process a new submission: log title and any card tags or mentions."""
     body = (submission.title or "") + "\n" + (getattr(submission, "selftext", "") or "")
     tags = extract_card_tags(body)
-    logger.info("Submission: %s (tags=%s)", submission.title, tags)
-    print(f"[submission] {submission.id} :: {submission.title} :: tags={tags}")
+    mentions = sorted(extract_card_mentions(body))
+    logger.info("Submission %s: %s (tags=%s, mentions=%s)", submission.id, submission.title, tags, mentions)
 
 
 def handle_comment(comment) -> None:
-    """Process a new comment: print author, body, and any card tags."""
+    """Process a new comment: log author, body preview, and any card tags or mentions."""
     tags = extract_card_tags(comment.body or "")
-    logger.info("Comment by %s (tags=%s)", comment.author, tags)
-    preview = (comment.body or "").replace("\n", " ")
-    print(f"[comment] {comment.id} :: {preview[:140]} :: tags={tags}")
+    mentions = sorted(extract_card_mentions(comment.body or ""))
+    logger.info("Comment by %s (tags=%s, mentions=%s)", comment.author, tags, mentions)
+    if logger.isEnabledFor(logging.DEBUG):
+        preview = (comment.body or "").replace("\n", " ")[:140]
+        logger.debug("[comment] %s :: %s", comment.id, preview)
+
+
+def log_mentions(thing_id: str, text: str) -> None:
+    """Log bare card-name mentions (only when BOT_DETECT_MENTIONS loaded names)."""
+    mentions = extract_card_mentions(text)
+    if mentions:
+        logger.info("[mention] %s :: %s", thing_id, sorted(mentions))
 
 
 def resolve_card(card_name: str) -> str:
@@ -203,6 +272,69 @@ def resolve_card(card_name: str) -> str:
     return compose_card_reply(card_name, image_url, details if details else None)
 
 
+def _post_reply(thing, reply_text: str) -> None:
+    """Reply to thing, waiting out Reddit rate limits between attempts.
+
+    Waits as long as the RATELIMIT message asks for (plus a second), else
+    backs off exponentially.
+    """
+    backoff = REPLY_INITIAL_BACKOFF_SECONDS
+    for attempt in range(1, REPLY_MAX_ATTEMPTS + 1):
+        try:
+            thing.reply(reply_text)
+            return
+        except Exception as exc:  # noqa: BLE001
+            if not is_rate_limit_error(exc) or attempt == REPLY_MAX_ATTEMPTS:
+                logger.exception("Reply failed: %s", exc)
+                return
+            requested = rate_limit_wait_seconds(exc)
+            delay = requested + 1.0 if requested is not None else backoff
+            logger.warning(
+                "Rate limited replying to %s; retrying in %.0fs", getattr(thing, "id", thing), delay
+            )
+            time.sleep(delay)
+            backoff = min(backoff * 2, REPLY_MAX_BACKOFF_SECONDS)
+
+
+def _reply_worker() -> None:
+    """Post queued replies one at a time."""
+    while True:
+        thing, reply_text = reply_queue.get()
+        try:
+            _post_reply(thing, reply_text)
+        finally:
+            reply_queue.task_done()
+
+
+def backfill(reddit, subreddits: Iterable[str], limit: int, process: Callable[[Any], None]) -> None:
+    """Process the newest submissions of each subreddit, one at a time.
+
+    Runs on the calling thread, so PRAW's own rate limiter paces every
+    request without an extra fixed sleep.
+    """
+    for sub in subreddits:
+        logger.info("[backfill] r/%s latest %s", sub, limit)
+        for submission in reddit.subreddit(sub).new(limit=limit):
+            process(submission)
+
+
+def prefetch_cards(card_names: Iterable[str]) -> None:
+    """Resolve distinct card names in parallel ahead of processing.
+
+    Hits stay cached for the full card TTL and misses for the shorter
+    negative TTL, so the sequential pass that follows rarely waits on the API.
+    """
+    unique = _unique_in_order(card_names)
+    if not unique:
+        return
+    try:
+        for _ in _RESOLVE_EXECUTOR.map(resolve_card, unique):
+            pass
+    except Exception as exc:  # noqa: BLE001
+        logger.exception("Card prefetch failed: %s", exc)
+
+
 if __name__ == "__main__":
-    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    level = logging.DEBUG if os.environ.get("BOT_DEBUG", "0") == "1" else logging.INFO
+    logging.basicConfig(level=level, format="%(asctime)s %(levelname)s %(message)s")
     run_bot(["riftboundtcg"])
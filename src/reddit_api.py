@@ -2,18 +2,33 @@
 import logging
 import os
 import re
-from typing import Iterable, Iterator, List, Optional
+from typing import Any, Iterable, Iterator, List, Optional, Set
 
 try:
     import praw
-    from praw.models import Comment, Submission
+    import requests
+    from praw.exceptions import RedditAPIException
+    from praw.models import Comment, Submission, Subreddit
+    from requests.adapters import HTTPAdapter
 except ModuleNotFoundError as exc:
     raise RuntimeError("praw is required for reddit_api but is not installed") from exc
 
+try:
+    import ahocorasick
+except ModuleNotFoundError:  # optional; extract_card_mentions falls back to a regex
+    ahocorasick = None
+
 
 logger = logging.getLogger(__name__)
-_CARD_TAG_PATTERN = re.compile(r"\[\[([^\[\]]+)\]\]")
+# Keep-alive connections per host for the shared PRAW session, which the
+# stream and reply threads all use (requests defaults to 10).
+_HTTP_POOL_MAXSIZE = 16
 _reddit_client: Optional[praw.Reddit] = None
+_RATELIMIT_WAIT_PATTERN = re.compile(r"(\d+)\s*(millisecond|second|minute|hour)s?\b", re.IGNORECASE)
+_SECONDS_PER_UNIT = {"millisecond": 0.001, "second": 1.0, "minute": 60.0, "hour": 3600.0}
+# Built by set_known_card_names: an ahocorasick.Automaton, or a
+# (pattern, names_by_key) pair when pyahocorasick is not installed.
+_card_name_matcher: Any = None
 
 
 def _ensure_client() -> praw.Reddit:
@@ -23,18 +38,24 @@ def _ensure_client() -> praw.Reddit:
     return _reddit_client
 
 
+def _combined_subreddit(subreddits: Iterable[str]) -> Subreddit:
+    """Return one subreddit object spanning all names (r/a+b+...)."""
+    names = tuple(subreddits)
+    if not names:
+        raise ValueError("At least one subreddit name is required")
+    return _ensure_client().subreddit("+".join(names))
+
+
 def stream_submissions(subreddits: Iterable[str]) -> Iterator[Submission]:
     """Yield new submissions from the given subreddits using PRAW streaming."""
-    reddit = _ensure_client()
-    subreddit = reddit.subreddit("+".join(subreddits))
+    subreddit = _combined_subreddit(subreddits)
     for submission in subreddit.stream.submissions(skip_existing=True):
         yield submission
 
 
 def stream_comments(subreddits: Iterable[str]) -> Iterator[Comment]:
     """Yield new comments from the given subreddits using PRAW streaming."""
-    reddit = _ensure_client()
-    subreddit = reddit.subreddit("+".join(subreddits))
+    subreddit = _combined_subreddit(subreddits)
     for comment in subreddit.stream.comments(skip_existing=True):
         yield comment
 
@@ -49,13 +70,80 @@ def fetch_submission_comments(submission_id: str) -> List[str]:
 
 def extract_card_tags(text: str) -> List[str]:
     """Parse a text body and return card tags formatted like [[Card Name]]."""
-    matches = _CARD_TAG_PATTERN.findall(text or "")
-    cleaned = []
-    for match in matches:
-        card_name = match.strip()
-        if card_name:
-            cleaned.append(card_name)
-    return cleaned
+    # Scans with str.find rather than a regex: tags are sparse in long bodies
+    # and the C-level substring search skips the text in between quickly.
+    tags: List[str] = []
+    if not text:
+        return tags
+    start = 0
+    while True:
+        open_at = text.find("[[", start)
+        if open_at < 0:
+            return tags
+        close_at = text.find("]]", open_at + 2)
+        if close_at < 0:
+            return tags
+        # Use the innermost "[[" so "[[[Name]]" still yields "Name".
+        bracket = text.rfind("[", open_at, close_at)
+        inner = text[bracket + 1:close_at]
+        if text[bracket - 1] == "[" and "]" not in inner:
+            name = inner.strip()
+            if name:
+                tags.append(name)
+        start = close_at + 2
+
+
+def set_known_card_names(names: Iterable[str]) -> None:
+    """Build the matcher used by extract_card_mentions from canonical card names."""
+    global _card_name_matcher
+    names_by_key: dict[str, str] = {}
+    for name in names:
+        key = name.strip().lower()
+        if key:
+            names_by_key.setdefault(key, name.strip())
+    if not names_by_key:
+        _card_name_matcher = None
+    elif ahocorasick is not None:
+        automaton = ahocorasick.Automaton()
+        for key, name in names_by_key.items():
+            automaton.add_word(key, (len(key), name))
+        automaton.make_automaton()
+        _card_name_matcher = automaton
+    else:
+        alternatives = "|".join(re.escape(key) for key in sorted(names_by_key, key=len, reverse=True))
+        _card_name_matcher = (re.compile(rf"(?<!\w)(?:{alternatives})(?!\w)"), names_by_key)
+
+
+def _is_word_edge(text: str, index: int) -> bool:
+    # Same notion of a word character as the regex fallback's \w.
+    return index < 0 or index >= len(text) or not (text[index].isalnum() or text[index] == "_")
+
+
+def extract_card_mentions(text: str) -> Set[str]:
+    """Return known card names mentioned as whole words in text, ignoring case.
+
+    Like a regex alternation, the longest name wins at each position and
+    matches do not overlap, so "Teemo, Scout" does not also report "Teemo".
+    """
+    matcher = _card_name_matcher
+    if matcher is None or not text:
+        return set()
+    lowered = text.lower()
+    if isinstance(matcher, tuple):
+        pattern, names_by_key = matcher
+        return {names_by_key[match.group(0)] for match in pattern.finditer(lowered)}
+    candidates = []
+    for end, (length, name) in matcher.iter(lowered):
+        start = end - length + 1
+        if _is_word_edge(lowered, start - 1) and _is_word_edge(lowered, end + 1):
+            candidates.append((start, -length, name))
+    found: Set[str] = set()
+    covered_until = 0
+    for start, neg_length, name in sorted(candidates):
+        if start >= covered_until:
+            found.add(name)
+            covered_until = start - neg_length
+    return found
 
 
 def reply_with_card_info(thing_fullname: str, message: str) -> None:
@@ -75,6 +163,26 @@ def reply_with_card_info(thing_fullname: str, message: str) -> None:
         raise
 
 
+def is_rate_limit_error(exc: BaseException) -> bool:
+    """Return True if exc is Reddit rejecting an action with RATELIMIT."""
+    if not isinstance(exc, RedditAPIException):
+        return False
+    return any(item.error_type == "RATELIMIT" for item in exc.items)
+
+
+def rate_limit_wait_seconds(exc: BaseException) -> Optional[float]:
+    """Return the wait a RATELIMIT error asks for ("take a break for 5 minutes"), if any."""
+    if not isinstance(exc, RedditAPIException):
+        return None
+    for item in exc.items:
+        if item.error_type != "RATELIMIT":
+            continue
+        match = _RATELIMIT_WAIT_PATTERN.search(item.message or "")
+        if match:
+            return int(match.group(1)) * _SECONDS_PER_UNIT[match.group(2).lower()]
+    return None
+
+
 def build_reddit_client(client_id: str, client_secret: str, user_agent: str) -> praw.Reddit:
     """Initialize and store a Reddit API client instance."""
     global _reddit_client
@@ -89,5 +197,10 @@ def build_reddit_client(client_id: str, client_secret: str, user_agent: str) ->
     if username and password:
         kwargs.update({"username": username, "password": password})
 
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_maxsize=_HTTP_POOL_MAXSIZE)
+    session.mount("https://", adapter)
+    kwargs["requestor_kwargs"] = {"session": session}
+
     _reddit_client = praw.Reddit(**kwargs)
     return _reddit_client
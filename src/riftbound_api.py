@@ -1,19 +1,176 @@
 """Riftbound and fallback card image lookups.
 
-This module intentionally avoids extra dependencies.
+This module intentionally avoids extra dependencies (orjson is used for
+decoding responses when it happens to be installed).
 It uses the community Riftbound API first, then a configurable fallback.
 """
 
 from __future__ import annotations
 
+import functools
 import http.client
 import json
 import os
+import threading
+import time
 import urllib.parse
-from typing import Any, Optional
+from collections import OrderedDict
+from typing import Any, Callable, Optional, TypeVar
+
+try:
+    # Optional: faster decoding; orjson.JSONDecodeError subclasses json's.
+    from orjson import loads as _json_loads
+except ModuleNotFoundError:
+    from json import loads as _json_loads
 
 
 RIFTBOUND_HOST = os.environ.get("RIFTBOUND_HOST", "api.riftcodex.com")
+CARD_CACHE_TTL_SECONDS = float(os.environ.get("RIFTBOUND_CACHE_TTL", "3600"))
+# Misses and API errors are cached briefly so a hot unknown tag does not
+# hit the API on every mention, but still recover soon after an outage.
+CARD_CACHE_NEGATIVE_TTL_SECONDS = float(os.environ.get("RIFTBOUND_NEGATIVE_CACHE_TTL", "120"))
+CARD_CACHE_MAXSIZE = 4096
+
+_T = TypeVar("_T")
+
+# Keep-alive connections, one per (host, timeout) and per thread, since
+# http.client connections are not safe to share between threads.
+_local = threading.local()
+
+# Candidate lookup paths, formatted with the URL-encoded card name.
+# Documented endpoint: GET https://api.riftcodex.com/cards/name?fuzzy=...
+# Only the first match is used, so ask for a single-item page.
+_CANDIDATE_TEMPLATES: tuple[str, ...] = ("/cards/name?fuzzy={}&size=1",)
+
+
+class _TTLCache:
+    """Thread-safe LRU cache whose entries expire after a TTL.
+
+    Entries use ttl_seconds unless set() is given a shorter per-entry TTL.
+    """
+
+    def __init__(self, maxsize: int, ttl_seconds: float) -> None:
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self._data: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> tuple[bool, Any]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return False, None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return False, None
+            self._data.move_to_end(key)
+            return True, value
+
+    def set(self, key: str, value: Any, ttl_seconds: Optional[float] = None) -> None:
+        if ttl_seconds is None:
+            ttl_seconds = self.ttl_seconds
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl_seconds, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+class _RateLimiter:
+    """Client-side throttle driven by a host's X-Ratelimit-* response headers.
+
+    Each request spends one of the remaining calls; once the budget is spent,
+    callers block until the advertised reset. After a reset a single request
+    goes out first and the rest wait (up to RESET_PROBE_SECONDS) for its
+    headers to report the new budget. Hosts that do not send the headers are
+    never throttled.
+    """
+
+    RESET_PROBE_SECONDS = 1.0
+
+    def __init__(self) -> None:
+        self._remaining: Optional[float] = None
+        self._reset_at = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        while True:
+            with self._lock:
+                if self._remaining is None:
+                    return
+                if self._remaining >= 1:
+                    self._remaining -= 1
+                    return
+                now = time.monotonic()
+                if now >= self._reset_at:
+                    self._reset_at = now + self.RESET_PROBE_SECONDS
+                    return
+                delay = self._reset_at - now
+            # Sleep without the lock so in-flight responses can still update().
+            time.sleep(delay)
+
+    def update(self, remaining: Optional[str], reset: Optional[str]) -> None:
+        if remaining is None or reset is None:
+            return
+        try:
+            remaining_calls = float(remaining)
+            reset_seconds = float(reset)
+        except ValueError:
+            return
+        with self._lock:
+            self._remaining = remaining_calls
+            self._reset_at = time.monotonic() + reset_seconds
+
+
+_rate_limiters: dict[str, _RateLimiter] = {}
+_rate_limiters_lock = threading.Lock()
+
+
+def _rate_limiter(host: str) -> _RateLimiter:
+    with _rate_limiters_lock:
+        limiter = _rate_limiters.get(host)
+        if limiter is None:
+            limiter = _rate_limiters[host] = _RateLimiter()
+        return limiter
+
+
+def _cached_by_card_name(
+    is_hit: Callable[[Any], bool],
+) -> Callable[[Callable[[str], _T]], Callable[[str], _T]]:
+    """Cache a card lookup by its normalized name.
+
+    Results accepted by is_hit are kept for CARD_CACHE_TTL_SECONDS; misses
+    and API errors only for CARD_CACHE_NEGATIVE_TTL_SECONDS. Exceptions are
+    never cached.
+    """
+
+    def decorator(func: Callable[[str], _T]) -> Callable[[str], _T]:
+        cache = _TTLCache(CARD_CACHE_MAXSIZE, CARD_CACHE_TTL_SECONDS)
+
+        @functools.wraps(func)
+        def wrapper(card_name: str) -> _T:
+            key = (card_name or "").strip().lower()
+            if not key or CARD_CACHE_TTL_SECONDS <= 0:
+                return func(card_name)
+            hit, value = cache.get(key)
+            if hit:
+                return value
+            value = func(card_name)
+            if is_hit(value):
+                cache.set(key, value)
+            elif CARD_CACHE_NEGATIVE_TTL_SECONDS > 0:
+                cache.set(key, value, min(CARD_CACHE_NEGATIVE_TTL_SECONDS, CARD_CACHE_TTL_SECONDS))
+            return value
+
+        wrapper.cache_clear = cache.clear  # type: ignore[attr-defined]
+        return wrapper
+
+    return decorator
 
 
 def build_riftbound_client(api_key: Optional[str] = None) -> http.client.HTTPSConnection:
@@ -22,30 +179,69 @@ def build_riftbound_client(api_key: Optional[str] = None) -> http.client.HTTPSCo
     return http.client.HTTPSConnection(RIFTBOUND_HOST)
 
 
+def _get_connection(host: str, timeout_seconds: int) -> tuple[http.client.HTTPSConnection, bool]:
+    """Return this thread's connection to host and whether it was reused."""
+    connections = getattr(_local, "connections", None)
+    if connections is None:
+        connections = _local.connections = {}
+    key = (host, timeout_seconds)
+    conn = connections.get(key)
+    if conn is not None:
+        return conn, True
+    conn = http.client.HTTPSConnection(host, timeout=timeout_seconds)
+    connections[key] = conn
+    return conn, False
+
+
+def _drop_connection(host: str, timeout_seconds: int) -> None:
+    connections = getattr(_local, "connections", None) or {}
+    conn = connections.pop((host, timeout_seconds), None)
+    if conn is not None:
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+
+def _send_get(host: str, path: str, hdrs: dict[str, str], timeout_seconds: int) -> tuple[int, bytes]:
+    limiter = _rate_limiter(host)
+    limiter.acquire()
+    while True:
+        conn, reused = _get_connection(host, timeout_seconds)
+        try:
+            conn.request("GET", path, "", hdrs)
+            res = conn.getresponse()
+            raw = res.read()
+        except (http.client.HTTPException, OSError) as exc:
+            _drop_connection(host, timeout_seconds)
+            # A reused keep-alive connection may have been closed by the
+            # server; retry once on a fresh one. Timeouts and failures on a
+            # new connection are real errors.
+            if reused and not isinstance(exc, TimeoutError):
+                continue
+            raise
+        break
+    limiter.update(res.getheader("X-Ratelimit-Remaining"), res.getheader("X-Ratelimit-Reset"))
+    if res.will_close:
+        _drop_connection(host, timeout_seconds)
+    return res.status, raw
+
+
 def _http_get_json(
     host: str,
     path: str,
     headers: Optional[dict[str, str]] = None,
     timeout_seconds: int = 10,
 ) -> tuple[int, Any]:
-    conn = http.client.HTTPSConnection(host, timeout=timeout_seconds)
     hdrs = {"Accept": "application/json"}
     if headers:
         hdrs.update(headers)
+    status, raw = _send_get(host, path, hdrs, timeout_seconds)
     try:
-        conn.request("GET", path, "", hdrs)
-        res = conn.getresponse()
-        raw = res.read()
-        try:
-            payload = json.loads(raw.decode("utf-8")) if raw else None
-        except json.JSONDecodeError:
-            payload = raw.decode("utf-8", errors="replace")
-        return res.status, payload
-    finally:
-        try:
-            conn.close()
-        except Exception:
-            pass
+        payload = _json_loads(raw) if raw else None
+    except json.JSONDecodeError:
+        payload = raw.decode("utf-8", errors="replace")
+    return status, payload
 
 
 def _first_card_obj(payload: Any) -> Optional[dict[str, Any]]:
@@ -63,27 +259,61 @@ def _first_card_obj(payload: Any) -> Optional[dict[str, Any]]:
     return None
 
 
-def _extract_image_url(card: dict[str, Any]) -> Optional[str]:
-    # Try common key names.
-    for key in ("image", "imageUrl", "image_url", "imageURI", "imageUri", "image_uri"):
-        value = card.get(key)
+_IMAGE_KEYS = ("image", "imageUrl", "image_url", "imageURI", "imageUri", "image_uri")
+_MEDIA_IMAGE_KEYS = ("imageUrl",)
+_IMAGES_SIZE_KEYS = ("normal", "large", "small", "png", "default")
+
+
+def _first_nonblank_str(mapping: dict[str, Any], keys: tuple[str, ...]) -> Optional[str]:
+    for key in keys:
+        value = mapping.get(key)
         if isinstance(value, str) and value.strip():
             return value.strip()
+    return None
 
+
+def _extract_image_url(card: dict[str, Any]) -> Optional[str]:
+    # Riftcodex puts the image under media.image_url; check that first.
     media = card.get("media")
     if isinstance(media, dict):
-        value = media.get("image_url") or media.get("imageUrl")
+        value = media.get("image_url")
         if isinstance(value, str) and value.strip():
             return value.strip()
-    images = card.get("images")
-    if isinstance(images, dict):
-        for key in ("normal", "large", "small", "png", "default"):
-            value = images.get(key)
-            if isinstance(value, str) and value.strip():
-                return value.strip()
-    return None
+
+    # Otherwise try common key names.
+    value = _first_nonblank_str(card, _IMAGE_KEYS)
+    if value is None and isinstance(media, dict):
+        value = _first_nonblank_str(media, _MEDIA_IMAGE_KEYS)
+    if value is None:
+        images = card.get("images")
+        if isinstance(images, dict):
+            value = _first_nonblank_str(images, _IMAGES_SIZE_KEYS)
+    return value
+
+
+def _card_details_from_payload(status: int, payload: Any, name: str) -> Optional[dict]:
+    if status != 200 or payload is None:
+        return None
+
+    # Schema: { items: [ {...}, ... ], total, page, size, pages }
+    if isinstance(payload, dict) and isinstance(payload.get("items"), list):
+        items = payload.get("items")
+        first = items[0] if items else None
+        card = first if isinstance(first, dict) else None
+    else:
+        # Fallback parsing if the API shape differs.
+        card = _first_card_obj(payload)
+    if card is None:
+        return None
+    return {
+        "raw": card,
+        "name": card.get("name") or name,
+        "image_url": _extract_image_url(card),
+        "source": "riftbound",
+    }
 
 
+@_cached_by_card_name(lambda details: bool(details and details.get("image_url")))
 def search_card_details(card_name: str) -> dict:
     """Return structured card details from Riftbound.
 
@@ -96,40 +326,13 @@ reasonable endpoints and normalizes the result.
 
     encoded = urllib.parse.quote(name)
 
-    # Documented endpoint:
-    # GET https://api.riftcodex.com/cards/name?fuzzy=...
-    attempts = [f"/cards/name?fuzzy={encoded}"]
     last_payload: Any = None
-    for path in attempts:
-        status, payload = _http_get_json(RIFTBOUND_HOST, path)
+    for template in _CANDIDATE_TEMPLATES:
+        status, payload = _http_get_json(RIFTBOUND_HOST, template.format(encoded))
         last_payload = payload
-        if status != 200 or payload is None:
-            continue
-
-        # Schema: { items: [ {...}, ... ], total, page, size, pages }
-        if isinstance(payload, dict) and isinstance(payload.get("items"), list):
-            items = payload.get("items")
-            if items:
-                first = items[0]
-                if isinstance(first, dict):
-                    return {
-                        "raw": first,
-                        "name": first.get("name") or name,
-                        "image_url": _extract_image_url(first),
-                        "source": "riftbound",
-                    }
-            continue
-
-        # Fallback parsing if the API shape differs.
-        card = _first_card_obj(payload)
-        if card is None:
-            continue
-        return {
-            "raw": card,
-            "name": card.get("name") or name,
-            "image_url": _extract_image_url(card),
-            "source": "riftbound",
-        }
+        details = _card_details_from_payload(status, payload, name)
+        if details is not None:
+            return details
 
     if last_payload is not None:
         return {"raw": last_payload, "name": name, "image_url": None, "source": "riftbound"}
@@ -144,6 +347,7 @@ def search_card_image(card_name: str) -> Optional[str]:
     return details.get("image_url")
 
 
+@_cached_by_card_name(lambda image_url: image_url is not None)
 def fallback_search_card_image(card_name: str) -> Optional[str]:
     """Fallback lookup for a card image URL.
 
@@ -177,8 +381,29 @@ an image URL from common fields.
     return _extract_image_url(card)
 
 
+def fetch_card_names(page_size: int = 100, max_pages: int = 100) -> list[str]:
+    """Return every card name listed by Riftbound's paginated /cards endpoint."""
+    names: list[str] = []
+    page = 1
+    while page <= max_pages:
+        status, payload = _http_get_json(RIFTBOUND_HOST, f"/cards?page={page}&size={page_size}")
+        if status != 200 or not isinstance(payload, dict):
+            break
+        items = payload.get("items")
+        if not isinstance(items, list) or not items:
+            break
+        for item in items:
+            if isinstance(item, dict) and isinstance(item.get("name"), str):
+                names.append(item["name"])
+        pages = payload.get("pages")
+        if not isinstance(pages, int) or page >= pages:
+            break
+        page += 1
+    return names
+
+
 def compose_card_reply(card_name: str, image_url: Optional[str], details: Optional[dict]) -> str:
-    """Format output (for prints/replies).
+    """Format output (for logs/replies).
 
     Per current bot behavior, this returns only the image URL when found.
     """
@@ -0,0 +1,126 @@
+import unittest
+
+import os
+import sys
+from unittest.mock import patch
+
+
+REPO_ROOT = os.path.dirname(os.path.dirname(__file__))
+SRC_DIR = os.path.join(REPO_ROOT, "src")
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+
+import main as main
+from praw.exceptions import RedditAPIException, RedditErrorItem
+
+
+def _reddit_error(error_type: str, message: str) -> RedditAPIException:
+    return RedditAPIException([RedditErrorItem(error_type, message=message, field="ratelimit")])
+
+
+class _FakeThing:
+    id = "abc123"
+
+    def __init__(self, failures):
+        self.failures = list(failures)
+        self.replies = []
+
+    def reply(self, text):
+        if self.failures:
+            raise self.failures.pop(0)
+        self.replies.append(text)
+
+
+class _FakeSubreddit:
+    def __init__(self, submissions):
+        self.submissions = submissions
+
+    def new(self, limit):
+        return iter(self.submissions[:limit])
+
+
+class _FakeReddit:
+    def __init__(self, listings):
+        self.listings = listings
+
+    def subreddit(self, name):
+        return _FakeSubreddit(self.listings[name])
+
+
+class TestBackfill(unittest.TestCase):
+    def test_processes_newest_submissions_in_order_per_subreddit(self):
+        reddit = _FakeReddit({"a": ["a1", "a2", "a3"], "b": ["b1"]})
+        seen = []
+        main.backfill(reddit, ["a", "b"], 2, seen.append)
+
+        self.assertEqual(seen, ["a1", "a2", "b1"])
+
+
+class TestProcessedTracker(unittest.TestCase):
+    def test_evicts_oldest_when_full(self):
+        tracker = main.ProcessedTracker(maxsize=2)
+        self.assertEqual(
+            [tracker.seen_and_mark(name) for name in ("a", "b", "a", "c", "a", "c")],
+            [False, False, True, False, False, True],
+        )
+
+    def test_rejects_non_positive_maxsize(self):
+        for maxsize in (0, -1):
+            with self.subTest(maxsize=maxsize):
+                with self.assertRaises(ValueError):
+                    main.ProcessedTracker(maxsize=maxsize)
+
+    def test_load_config_reads_maxsize_from_env(self):
+        with patch.dict("os.environ", {"PROCESSED_FULLNAMES_MAXSIZE": "123"}):
+            self.assertEqual(main.load_config()["processed_maxsize"], 123)
+        with patch.dict("os.environ", {}, clear=True):
+            self.assertEqual(main.load_config()["processed_maxsize"], main.PROCESSED_FULLNAMES_MAXSIZE)
+
+
+class TestPrefetchCards(unittest.TestCase):
+    def test_resolves_each_name_once_ignoring_case(self):
+        with patch.object(main, "resolve_card", return_value="line") as mock_resolve:
+            main.prefetch_cards(["Jinx", " jinx ", "", "Teemo", "JINX"])
+
+        self.assertCountEqual([c.args[0] for c in mock_resolve.call_args_list], ["Jinx", "Teemo"])
+
+    def test_lookup_errors_are_logged_not_raised(self):
+        with patch.object(main, "resolve_card", side_effect=ConnectionResetError("down")):
+            with self.assertLogs(main.logger, "ERROR"):
+                main.prefetch_cards(["Jinx"])
+
+
+class TestPostReply(unittest.TestCase):
+    def setUp(self):
+        self.sleeps = []
+        patcher = patch.object(main.time, "sleep", side_effect=self.sleeps.append)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_waits_as_long_as_reddit_asks(self):
+        thing = _FakeThing([_reddit_error("RATELIMIT", "Take a break for 9 minutes before trying again.")])
+        main._post_reply(thing, "hello")
+
+        self.assertEqual(thing.replies, ["hello"])
+        self.assertEqual(self.sleeps, [9 * 60 + 1.0])
+
+    def test_backoff_reaches_cap_without_a_wait_hint(self):
+        failures = [_reddit_error("RATELIMIT", "Slow down.")] * (main.REPLY_MAX_ATTEMPTS - 1)
+        thing = _FakeThing(failures)
+        main._post_reply(thing, "hello")
+
+        self.assertEqual(thing.replies, ["hello"])
+        self.assertEqual(self.sleeps[0], main.REPLY_INITIAL_BACKOFF_SECONDS)
+        self.assertEqual(self.sleeps[-1], main.REPLY_MAX_BACKOFF_SECONDS)
+
+    def test_other_errors_are_not_retried(self):
+        thing = _FakeThing([_reddit_error("THREAD_LOCKED", "Thread is locked.")])
+        with self.assertLogs(main.logger, level="ERROR"):
+            main._post_reply(thing, "hello")
+
+        self.assertEqual(thing.replies, [])
+        self.assertEqual(self.sleeps, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,6 +2,7 @@ import unittest
 
 import os
 import sys
+from unittest.mock import patch
 
 
 REPO_ROOT = os.path.dirname(os.path.dirname(__file__))
@@ -10,6 +11,7 @@ if SRC_DIR not in sys.path:
     sys.path.insert(0, SRC_DIR)
 
 import reddit_api as reddit_api
+from praw.exceptions import RedditAPIException, RedditErrorItem
 
 
 class TestRedditParsing(unittest.TestCase):
@@ -25,6 +27,54 @@ class TestRedditParsing(unittest.TestCase):
         text = "Line1 [[A]]\nLine2 [[B]]"
         self.assertEqual(reddit_api.extract_card_tags(text), ["A", "B"])
 
+    def test_extract_card_tags_ignores_nested_brackets(self):
+        text = "[[[A]] [[B]x]] [[C [[D]] [[E"
+        self.assertEqual(reddit_api.extract_card_tags(text), ["A", "D"])
+
+    MENTION_NAMES = ["Teemo, Scout", "Teemo", "Jinx", "Scout"]
+    MENTION_CASES = [
+        ("Played teemo, scout into JINX, but nothing jinxed.", {"Teemo, Scout", "Jinx"}),
+        ("Teemo and a scout", {"Teemo", "Scout"}),
+        ("jinx_deck teemo2 Jinx!", {"Jinx"}),
+    ]
+
+    def _assert_mentions(self):
+        reddit_api.set_known_card_names(self.MENTION_NAMES)
+        self.addCleanup(reddit_api.set_known_card_names, [])
+        for text, expected in self.MENTION_CASES:
+            with self.subTest(text=text):
+                self.assertEqual(reddit_api.extract_card_mentions(text), expected)
+
+    def test_extract_card_mentions_regex_fallback(self):
+        with patch.object(reddit_api, "ahocorasick", None):
+            self._assert_mentions()
+
+    @unittest.skipIf(reddit_api.ahocorasick is None, "pyahocorasick is not installed")
+    def test_extract_card_mentions_automaton(self):
+        self._assert_mentions()
+
+    def test_extract_card_mentions_without_known_names(self):
+        reddit_api.set_known_card_names([])
+        self.assertEqual(reddit_api.extract_card_mentions("Jinx"), set())
+
+
+class TestRateLimitParsing(unittest.TestCase):
+    def test_rate_limit_wait_seconds_parses_message(self):
+        cases = [
+            ("Take a break for 5 minutes before trying again.", 300.0),
+            ("Take a break for 1 minute before trying again.", 60.0),
+            ("Take a break for 30 seconds before trying again.", 30.0),
+            ("Slow down.", None),
+        ]
+        for message, expected in cases:
+            with self.subTest(message=message):
+                exc = RedditAPIException([RedditErrorItem("RATELIMIT", message=message)])
+                self.assertEqual(reddit_api.rate_limit_wait_seconds(exc), expected)
+
+        locked = RedditAPIException([RedditErrorItem("THREAD_LOCKED", message="for 5 minutes")])
+        self.assertIsNone(reddit_api.rate_limit_wait_seconds(locked))
+        self.assertIsNone(reddit_api.rate_limit_wait_seconds(ValueError("for 5 minutes")))
+
 
 if __name__ == "__main__":
     unittest.main()
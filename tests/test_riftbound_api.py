@@ -1,5 +1,6 @@
 import unittest
 
+import http.client
 import os
 import sys
 import urllib.parse
@@ -83,11 +84,206 @@ class TestRiftboundApi(unittest.TestCase):
                     msg=f"Expected image_url for query '{q}', got: {image_url}\nraw={raw}",
                 )
 
+    def test_search_card_details_cached_by_normalized_name(self):
+        payload = {"items": [{"name": "Teemo, Scout", "image": "http://example.com/teemo.png"}]}
+        riftbound_api.search_card_details.cache_clear()
+        self.addCleanup(riftbound_api.search_card_details.cache_clear)
+        with patch.object(riftbound_api, "_http_get_json", return_value=(200, payload)) as mock_get:
+            first = riftbound_api.search_card_details("Teemo, Scout")
+            second = riftbound_api.search_card_details("  teemo, scout ")
+
+        self.assertEqual(mock_get.call_count, 1)
+        self.assertEqual(first, second)
+        self.assertEqual(first.get("image_url"), "http://example.com/teemo.png")
+
+    def _patch_clock(self) -> "_FakeClock":
+        clock = _FakeClock()
+        patcher = patch.object(riftbound_api.time, "monotonic", side_effect=clock.monotonic)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        return clock
+
+    def test_search_card_details_caches_errors_briefly(self):
+        card = {"items": [{"name": "Jinx", "image": "http://example.com/jinx.png"}]}
+        responses = [(500, {"detail": "Internal Server Error"}), (200, card)]
+        riftbound_api.search_card_details.cache_clear()
+        self.addCleanup(riftbound_api.search_card_details.cache_clear)
+        clock = self._patch_clock()
+        with patch.object(riftbound_api, "_http_get_json", side_effect=responses) as mock_get:
+            failed = riftbound_api.search_card_details("Jinx")
+            self.assertEqual(riftbound_api.search_card_details("jinx"), failed)
+            self.assertEqual(mock_get.call_count, 1)
+            clock.now += riftbound_api.CARD_CACHE_NEGATIVE_TTL_SECONDS
+            recovered = riftbound_api.search_card_details("Jinx")
+
+        self.assertIsNone(failed.get("image_url"))
+        self.assertEqual(recovered.get("image_url"), "http://example.com/jinx.png")
+
+    def test_fallback_caches_errors_briefly(self):
+        env = {"APITCG_HOST": "fallback.invalid", "APITCG_PATH_TEMPLATE": "/cards?name={name}"}
+        responses = [(429, None), (200, [{"image": "http://example.com/jinx.png"}])]
+        riftbound_api.fallback_search_card_image.cache_clear()
+        self.addCleanup(riftbound_api.fallback_search_card_image.cache_clear)
+        clock = self._patch_clock()
+        with patch.dict("os.environ", env), patch.object(
+            riftbound_api, "_http_get_json", side_effect=responses
+        ) as mock_get:
+            self.assertIsNone(riftbound_api.fallback_search_card_image("Jinx"))
+            self.assertIsNone(riftbound_api.fallback_search_card_image("Jinx"))
+            self.assertEqual(mock_get.call_count, 1)
+            clock.now += riftbound_api.CARD_CACHE_NEGATIVE_TTL_SECONDS
+            self.assertEqual(riftbound_api.fallback_search_card_image("Jinx"), "http://example.com/jinx.png")
+
+    def test_media_image_url_preferred_over_top_level_image(self):
+        card = {
+            "name": "Jinx",
+            "image": "http://example.com/top-level.png",
+            "media": {"image_url": " http://example.com/media.png "},
+        }
+        self.assertEqual(riftbound_api._extract_image_url(card), "http://example.com/media.png")
+
+    def test_fetch_card_names_follows_pages(self):
+        pages = [
+            (200, {"items": [{"name": "A"}, {"name": "B"}], "page": 1, "pages": 2}),
+            (200, {"items": [{"name": "C"}], "page": 2, "pages": 2}),
+        ]
+        with patch.object(riftbound_api, "_http_get_json", side_effect=pages) as mock_get:
+            names = riftbound_api.fetch_card_names(page_size=2)
+
+        self.assertEqual(names, ["A", "B", "C"])
+        self.assertEqual(mock_get.call_count, 2)
+
     def test_fallback_disabled_without_env(self):
         # Ensure fallback does nothing unless configured.
         with patch.dict("os.environ", {}, clear=True):
             self.assertIsNone(riftbound_api.fallback_search_card_image("anything"))
 
 
+class _FakeClock:
+    def __init__(self, now: float = 100.0):
+        self.now = now
+        self.sleeps: list[float] = []
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class TestRateLimiter(unittest.TestCase):
+    def setUp(self):
+        self.clock = _FakeClock()
+        for name in ("monotonic", "sleep"):
+            patcher = patch.object(riftbound_api.time, name, side_effect=getattr(self.clock, name))
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.limiter = riftbound_api._RateLimiter()
+
+    def test_without_headers_never_waits(self):
+        for _ in range(5):
+            self.limiter.acquire()
+        self.limiter.update(None, None)
+        self.limiter.acquire()
+        self.assertEqual(self.clock.sleeps, [])
+
+    def test_exhausted_budget_waits_for_reset(self):
+        self.limiter.update("2", "10")
+        self.limiter.acquire()
+        self.limiter.acquire()
+        self.assertEqual(self.clock.sleeps, [])
+
+        self.limiter.acquire()
+        self.assertEqual(self.clock.sleeps, [10.0])
+
+    def test_after_reset_others_wait_for_new_budget(self):
+        self.limiter.update("0", "5")
+        self.limiter.acquire()
+        self.assertEqual(self.clock.sleeps, [5.0])
+
+        # No headers yet from the request that went out after the reset.
+        self.limiter.acquire()
+        self.assertEqual(self.clock.sleeps, [5.0, riftbound_api._RateLimiter.RESET_PROBE_SECONDS])
+
+        self.limiter.update("3", "60")
+        self.limiter.acquire()
+        self.assertEqual(len(self.clock.sleeps), 2)
+
+
+class _FakeResponse:
+    def __init__(self, body: bytes = b"{}", status: int = 200, headers=None):
+        self.status = status
+        self.will_close = False
+        self._body = body
+        self._headers = headers or {}
+
+    def read(self) -> bytes:
+        return self._body
+
+    def getheader(self, name):
+        return self._headers.get(name)
+
+
+class _FakeConnection:
+    """Stand-in for HTTPSConnection; pops one outcome per request."""
+
+    outcomes: list = []
+    instances: list = []
+
+    def __init__(self, host, timeout=None):
+        _FakeConnection.instances.append(self)
+
+    def request(self, method, path, body, headers):
+        self._outcome = _FakeConnection.outcomes.pop(0)
+
+    def getresponse(self):
+        if isinstance(self._outcome, BaseException):
+            raise self._outcome
+        return self._outcome
+
+    def close(self):
+        pass
+
+
+class TestHttpConnectionReuse(unittest.TestCase):
+    HOST = "fake.invalid"
+
+    def setUp(self):
+        riftbound_api._local.connections = {}
+        _FakeConnection.instances = []
+        patcher = patch.object(riftbound_api.http.client, "HTTPSConnection", _FakeConnection)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(setattr, riftbound_api._local, "connections", {})
+
+    def test_reuses_connection_between_requests(self):
+        _FakeConnection.outcomes = [_FakeResponse(b'{"a": 1}'), _FakeResponse(b'{"a": 2}')]
+        self.assertEqual(riftbound_api._http_get_json(self.HOST, "/x"), (200, {"a": 1}))
+        self.assertEqual(riftbound_api._http_get_json(self.HOST, "/x"), (200, {"a": 2}))
+        self.assertEqual(len(_FakeConnection.instances), 1)
+
+    def test_retries_once_when_reused_connection_was_closed(self):
+        _FakeConnection.outcomes = [
+            _FakeResponse(),
+            http.client.RemoteDisconnected("closed"),
+            _FakeResponse(b'{"ok": true}'),
+        ]
+        riftbound_api._http_get_json(self.HOST, "/x")
+        self.assertEqual(riftbound_api._http_get_json(self.HOST, "/x"), (200, {"ok": True}))
+        self.assertEqual(len(_FakeConnection.instances), 2)
+
+    def test_does_not_retry_fresh_connection_or_timeout(self):
+        _FakeConnection.outcomes = [http.client.RemoteDisconnected("closed")]
+        with self.assertRaises(http.client.RemoteDisconnected):
+            riftbound_api._http_get_json(self.HOST, "/x")
+
+        _FakeConnection.outcomes = [_FakeResponse(), TimeoutError("timed out")]
+        riftbound_api._http_get_json(self.HOST, "/x")
+        with self.assertRaises(TimeoutError):
+            riftbound_api._http_get_json(self.HOST, "/x")
+        self.assertEqual(_FakeConnection.outcomes, [])
+
+
 if __name__ == "__main__":
     unittest.main()